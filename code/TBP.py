@@ -1,6 +1,10 @@
 import pygame
+import pygame.gfxdraw
 import numpy as np
 import sys
+from dataclasses import dataclass
+from math import hypot, sqrt
+from numba import njit
 from pygame.locals import *
 
 # Initialize pygame
@@ -13,7 +17,9 @@ CONTROL_HEIGHT = HEIGHT - SIMULATION_HEIGHT
 FPS = 60
 G = 6.67430e-11  # gravitational constant
 SCALE = 3e9  # Increased scale to see more movement
-TIME_STEP = 3600 * 24  # 1 day in seconds
+TIME_STEP = 3600.0 * 24 * 2  # 2 days in seconds (velocity-Verlet stays stable)
+SCREEN_OFFSET = np.array([WIDTH/2, SIMULATION_HEIGHT/2], dtype=np.float32)  # world origin on screen
+TRAIL_LENGTH = 400  # positions kept per body
 
 # Colors
 BLACK = (0, 0, 0)
@@ -33,84 +39,255 @@ clock = pygame.time.Clock()
 font = pygame.font.SysFont('Arial', 16)
 title_font = pygame.font.SysFont('Arial', 20, bold=True)
 
+class Label:
+    # Text surface that is only re-rendered when its text changes
+    def __init__(self, color, label_font=font):
+        self.color = color
+        self.font = label_font
+        self.text = None
+        self.surf = None
+        
+    def render(self, text):
+        if text != self.text:
+            self.text = text
+            self.surf = self.font.render(text, True, self.color)
+        return self.surf
+
+@dataclass
+class State:
+    # Structure-of-arrays storage for every body in the simulation.
+    # Vectors are single precision; masses stay double to keep their range.
+    positions: np.ndarray      # (N, 2) float32
+    velocities: np.ndarray     # (N, 2) float32
+    masses: np.ndarray         # (N,) float64
+    accelerations: np.ndarray  # (N, 2) float32, reused by velocity-Verlet
+    trail: np.ndarray          # (N, TRAIL_LENGTH, 2) float32 ring buffer of past positions
+    screen_xy: np.ndarray      # (N, 2) int32 body positions in screen coordinates
+    trail_head: int = 0        # next ring buffer slot to write
+    trail_len: int = 0
+    
+    @classmethod
+    def empty(cls, n):
+        return cls(np.zeros((n, 2), dtype=np.float32), np.zeros((n, 2), dtype=np.float32),
+                   np.zeros(n), np.zeros((n, 2), dtype=np.float32),
+                   np.empty((n, TRAIL_LENGTH, 2), dtype=np.float32), np.zeros((n, 2), dtype=np.int32))
+    
+    def snapshot(self):
+        # Copy of the physics arrays only; a snapshot has no trail or screen buffers
+        return State(self.positions.copy(), self.velocities.copy(),
+                     self.masses.copy(), self.accelerations.copy(), None, None)
+    
+    def copy_from(self, other):
+        # Copy in place so bodies viewing this state stay valid
+        self.positions[:] = other.positions
+        self.velocities[:] = other.velocities
+        self.masses[:] = other.masses
+        self.accelerations[:] = other.accelerations
+    
+    def is_finite(self):
+        return np.isfinite(self.positions).all() and np.isfinite(self.velocities).all()
+    
+    def clear_trail(self):
+        self.trail_head = 0
+        self.trail_len = 0
+
 class Body:
-    def __init__(self, mass, position, velocity, color, name, radius=10):
-        self.mass = mass
-        self.position = np.array(position, dtype=float)
-        self.velocity = np.array(velocity, dtype=float)
+    # Thin view onto one row of a State plus its drawing attributes
+    def __init__(self, state, idx, color, name, radius=10):
+        self.state = state
+        self.idx = idx
         self.color = color
         self.name = name
         self.radius = radius
-        self.trail = []
-        self.max_trail_length = 400
-        
-    def update_position(self, bodies, dt):
-        # Calculate gravitational forces from all other bodies
-        acceleration = np.zeros(2)
-        for body in bodies:
-            if body is not self:
-                r = body.position - self.position
-                distance = np.linalg.norm(r)
-                if distance > 0:
-                    force_magnitude = G * self.mass * body.mass / (distance ** 2 + 1e5)
-                    acceleration += force_magnitude * r / (distance * self.mass)
+        # The name never changes, so render it once
+        self._name_surf = font.render(self.name, True, WHITE)
+        self._name_w = self._name_surf.get_width()
+        # Pre-render the antialiased body circle once and blit it every frame
+        r = self.radius
+        self._sprite = pygame.Surface((2*r + 2, 2*r + 2), pygame.SRCALPHA)
+        pygame.gfxdraw.filled_circle(self._sprite, r, r, r, self.color)
+        pygame.gfxdraw.aacircle(self._sprite, r, r, r, self.color)
         
-        # Update velocity and position
-        self.velocity += acceleration * dt
-        self.position += self.velocity * dt
-        
-        # Add current position to trail
-        self.trail.append(self.position.copy())
-        if len(self.trail) > self.max_trail_length:
-            self.trail.pop(0)
+    def trail_points(self):
+        # Trail positions from oldest to newest
+        trail = self.state.trail[self.idx]
+        head = self.state.trail_head
+        if self.state.trail_len < TRAIL_LENGTH:
+            return trail[:self.state.trail_len]
+        return np.concatenate((trail[head:], trail[:head]))
     
     def draw(self, screen):
         # Draw trail
-        if len(self.trail) > 1:
-            points = []
-            for pos in self.trail:
-                x = pos[0] / SCALE + WIDTH/2
-                y = pos[1] / SCALE + SIMULATION_HEIGHT/2
-                if -2000 < x < WIDTH + 2000 and -2000 < y < SIMULATION_HEIGHT + 2000:
-                    points.append((int(x), int(y)))
+        if self.state.trail_len > 1:
+            xy = self.trail_points() * np.float32(1.0 / SCALE) + SCREEN_OFFSET
+            mask = ((xy[:, 0] > -2000) & (xy[:, 0] < WIDTH + 2000) &
+                    (xy[:, 1] > -2000) & (xy[:, 1] < SIMULATION_HEIGHT + 2000))
+            points = xy[mask].astype(np.int32).tolist()
             
             if len(points) > 1:
                 pygame.draw.lines(screen, self.color, False, points, 2)
         
-        # Draw body
-        try:
-            x = int(self.position[0] / SCALE + WIDTH/2)
-            y = int(self.position[1] / SCALE + SIMULATION_HEIGHT/2)
+        # Draw body at the screen position projected by the physics kernel
+        x = int(self.state.screen_xy[self.idx, 0])
+        y = int(self.state.screen_xy[self.idx, 1])
+        
+        if -2000 < x < WIDTH + 2000 and -2000 < y < SIMULATION_HEIGHT + 2000:
+            screen.blit(self._sprite, (x - self.radius, y - self.radius))
             
-            if -2000 < x < WIDTH + 2000 and -2000 < y < SIMULATION_HEIGHT + 2000:
-                pygame.draw.circle(screen, self.color, (x, y), self.radius)
-                
-                # Draw name
-                name_text = font.render(self.name, True, WHITE)
-                screen.blit(name_text, (x - name_text.get_width()//2, y + self.radius + 5))
-        except (ValueError, TypeError, OverflowError):
-            pass
+            # Draw name
+            screen.blit(self._name_surf, (x - self._name_w//2, y + self.radius + 5))
+
+# The kernels use NumPy's error model so a blow-up yields inf/NaN for the
+# main loop's finite check instead of raising ZeroDivisionError
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _accelerations(pos, mass, acc):
+    # Calculate gravitational accelerations, visiting each pair once and
+    # applying equal and opposite contributions (Newton's third law)
+    n = pos.shape[0]
+    for i in range(n):
+        acc[i, 0] = 0.0
+        acc[i, 1] = 0.0
+    for i in range(n):
+        for j in range(i + 1, n):
+            # Square in double precision: float32 overflows past ~1.8e19 m
+            rx = np.float64(pos[j, 0] - pos[i, 0])
+            ry = np.float64(pos[j, 1] - pos[i, 1])
+            d2 = rx * rx + ry * ry + 1e5
+            inv = G / (d2 * sqrt(d2))
+            acc[i, 0] += mass[j] * inv * rx
+            acc[i, 1] += mass[j] * inv * ry
+            acc[j, 0] -= mass[i] * inv * rx
+            acc[j, 1] -= mass[i] * inv * ry
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _accelerations3(pos, mass, acc):
+    # Fully unrolled three-body case; each pair is computed once and applied
+    # to both bodies with opposite signs. Differences are widened to double
+    # so squaring can't overflow float32 after an ejection
+    r01x = np.float64(pos[1, 0] - pos[0, 0])
+    r01y = np.float64(pos[1, 1] - pos[0, 1])
+    r02x = np.float64(pos[2, 0] - pos[0, 0])
+    r02y = np.float64(pos[2, 1] - pos[0, 1])
+    r12x = np.float64(pos[2, 0] - pos[1, 0])
+    r12y = np.float64(pos[2, 1] - pos[1, 1])
+    
+    d01 = r01x * r01x + r01y * r01y + 1e5
+    d02 = r02x * r02x + r02y * r02y + 1e5
+    d12 = r12x * r12x + r12y * r12y + 1e5
+    inv01 = 1.0 / (d01 * sqrt(d01))
+    inv02 = 1.0 / (d02 * sqrt(d02))
+    inv12 = 1.0 / (d12 * sqrt(d12))
+    
+    m0 = mass[0] * G
+    m1 = mass[1] * G
+    m2 = mass[2] * G
+    acc[0, 0] = m1 * inv01 * r01x + m2 * inv02 * r02x
+    acc[0, 1] = m1 * inv01 * r01y + m2 * inv02 * r02y
+    acc[1, 0] = m2 * inv12 * r12x - m0 * inv01 * r01x
+    acc[1, 1] = m2 * inv12 * r12y - m0 * inv01 * r01y
+    acc[2, 0] = -m0 * inv02 * r02x - m1 * inv12 * r12x
+    acc[2, 1] = -m0 * inv02 * r02y - m1 * inv12 * r12y
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _compute_accelerations(pos, mass, acc):
+    # The simulation always has three bodies, so use the specialized kernel for it
+    if pos.shape[0] == 3:
+        _accelerations3(pos, mass, acc)
+    else:
+        _accelerations(pos, mass, acc)
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _kernel(pos, vel, acc, mass, dt):
+    # Velocity-Verlet: drift with the old acceleration, kick with the average
+    n = pos.shape[0]
+    for i in range(n):
+        for k in range(2):
+            pos[i, k] += vel[i, k] * dt + 0.5 * acc[i, k] * dt * dt
+            vel[i, k] += 0.5 * acc[i, k] * dt
+    _compute_accelerations(pos, mass, acc)
+    for i in range(n):
+        for k in range(2):
+            vel[i, k] += 0.5 * acc[i, k] * dt
+
+@njit(cache=True, error_model='numpy')
+def _project(pos, screen_xy, inv_scale, w2, h2):
+    # World to screen coordinates, clamped far off screen so the cast can't overflow
+    for i in range(pos.shape[0]):
+        x = pos[i, 0] * inv_scale + w2
+        y = pos[i, 1] * inv_scale + h2
+        screen_xy[i, 0] = int(min(max(x, -1e6), 1e6))
+        screen_xy[i, 1] = int(min(max(y, -1e6), 1e6))
+
+@njit(cache=True, fastmath=True, error_model='numpy')
+def _step_and_project(pos, vel, acc, mass, dt, steps, trail, trail_head, screen_xy, inv_scale, w2, h2):
+    # Run all sub-steps of a frame in compiled code, writing each position
+    # into the trail ring buffer, then project the final positions to screen
+    trail_length = trail.shape[1]
+    for s in range(steps):
+        _kernel(pos, vel, acc, mass, dt)
+        for i in range(pos.shape[0]):
+            trail[i, trail_head, 0] = pos[i, 0]
+            trail[i, trail_head, 1] = pos[i, 1]
+        trail_head = (trail_head + 1) % trail_length
+    _project(pos, screen_xy, inv_scale, w2, h2)
+    return trail_head
+
+def project_bodies(state):
+    _project(state.positions, state.screen_xy, 1.0 / SCALE, WIDTH/2, SIMULATION_HEIGHT/2)
+
+def step_bodies(state, dt, steps=1):
+    state.trail_head = _step_and_project(
+        state.positions, state.velocities, state.accelerations, state.masses, dt, steps,
+        state.trail, state.trail_head, state.screen_xy, 1.0 / SCALE, WIDTH/2, SIMULATION_HEIGHT/2)
+    state.trail_len = min(state.trail_len + steps, TRAIL_LENGTH)
+
+def energy_terms(state):
+    # Kinetic and pairwise potential energy, used to monitor integrator drift
+    pos = state.positions.astype(np.float64)
+    vel = state.velocities.astype(np.float64)
+    m = state.masses
+    kinetic = 0.5 * (m * (vel * vel).sum(-1)).sum()
+    r = pos[None, :, :] - pos[:, None, :]
+    d = np.sqrt((r * r).sum(-1) + 1e5)
+    i, j = np.triu_indices(len(m), 1)
+    potential = -G * (m[i] * m[j] / d[i, j]).sum()
+    return kinetic, potential
+
+def energy_drift(state, initial_energy, energy_scale):
+    # Change in total energy relative to the initial |KE| + |PE|, which unlike
+    # the total itself can't be close to zero for any mass setting
+    kinetic, potential = energy_terms(state)
+    return abs(kinetic + potential - initial_energy) / energy_scale
 
 class Slider:
     def __init__(self, x, y, width, min_val, max_val, initial_val, label):
         self.rect = pygame.Rect(x, y, width, 20)
+        # Screen area touched by the handle and label
+        self.dirty_rect = pygame.Rect(x - 8, y - 20, width + 16, 40)
         self.min_val = min_val
         self.max_val = max_val
         self.value = initial_val
         self.dragging = False
+        self.changed = False
         self.label = label
+        # Changes smaller than this are not applied or redrawn
+        self.epsilon = (max_val - min_val) * 1e-3
+        self._last_drawn_value = None
+        self._cached_surf = None
         
-    def draw(self, screen):
-        # Draw slider track
-        pygame.draw.rect(screen, GRAY, self.rect, border_radius=3)
+    def draw_track(self, surface):
+        pygame.draw.rect(surface, GRAY, self.rect, border_radius=3)
         
-        # Draw slider handle
+    def draw(self, screen):
+        # Draw slider handle (the track is part of the static background)
         handle_x = self.rect.x + (self.value - self.min_val) / (self.max_val - self.min_val) * self.rect.width
         pygame.draw.circle(screen, WHITE, (int(handle_x), self.rect.centery), 8)
         
         # Draw label and value
-        label_text = font.render(f"{self.label}: {self.value:.1e}", True, WHITE)
-        screen.blit(label_text, (self.rect.x, self.rect.y - 20))
+        if self._last_drawn_value is None or abs(self.value - self._last_drawn_value) > self.epsilon:
+            self._last_drawn_value = self.value
+            self._cached_surf = font.render(f"{self.label}: {self.value:.1e}", True, WHITE)
+        screen.blit(self._cached_surf, (self.rect.x, self.rect.y - 20))
         
     def handle_event(self, event):
         if event.type == MOUSEBUTTONDOWN and event.button == 1:
@@ -127,17 +304,34 @@ class Slider:
     def update_value(self, x):
         # Calculate value based on mouse position
         rel_x = max(0, min(self.rect.width, x - self.rect.x))
-        self.value = self.min_val + (rel_x / self.rect.width) * (self.max_val - self.min_val)
+        value = self.min_val + (rel_x / self.rect.width) * (self.max_val - self.min_val)
+        if abs(value - self.value) > self.epsilon:
+            self.value = value
+            self.changed = True
 
 # Create initial bodies in equilateral triangle formation
 def create_triangle_configuration(mass1=1e30, mass2=1e30, mass3=1e30, size=2.5e11):
+    state = State.empty(3)
+    state.masses[:] = (mass1, mass2, mass3)
+    
     # Equilateral triangle points
+    state.positions[0] = (0, -size)
+    state.positions[1] = (size * np.sqrt(3)/2, size/2)
+    state.positions[2] = (-size * np.sqrt(3)/2, size/2)
+    
+    state.velocities[0] = (1.2e4, 0)
+    state.velocities[1] = (-6e3, -1.04e4)
+    state.velocities[2] = (-6e3, 1.04e4)
+    
+    _compute_accelerations(state.positions, state.masses, state.accelerations)
+    project_bodies(state)
+    
     bodies = [
-        Body(mass1, [0, -size], [1.2e4, 0], RED, "Body 1", 12),
-        Body(mass2, [size * np.sqrt(3)/2, size/2], [-6e3, -1.04e4], GREEN, "Body 2", 12),
-        Body(mass3, [-size * np.sqrt(3)/2, size/2], [-6e3, 1.04e4], BLUE, "Body 3", 12)
+        Body(state, 0, RED, "Body 1", 12),
+        Body(state, 1, GREEN, "Body 2", 12),
+        Body(state, 2, BLUE, "Body 3", 12)
     ]
-    return bodies
+    return state, bodies
 
 # Create sliders for mass control
 sliders = [
@@ -152,14 +346,14 @@ class Button:
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
+        self.text_surf = font.render(self.text, True, WHITE)
+        self.text_rect = self.text_surf.get_rect(center=self.rect.center)
         
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect, border_radius=3)
         pygame.draw.rect(screen, WHITE, self.rect, 1, border_radius=3)
         
-        text_surf = font.render(self.text, True, WHITE)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        screen.blit(self.text_surf, self.text_rect)
         
     def is_clicked(self, event):
         if event.type == MOUSEBUTTONDOWN and event.button == 1:
@@ -171,114 +365,203 @@ pause_button = Button(350, SIMULATION_HEIGHT + 70, 120, 30, "Pause")
 clear_trails_button = Button(350, SIMULATION_HEIGHT + 110, 120, 30, "Clear Trails")
 
 # Initialize simulation
-bodies = create_triangle_configuration()
+# Compile the physics kernel up front so the first frame isn't stalled. The
+# warm-up must use the same argument types as the main loop (float32 state,
+# float TIME_STEP, int step count) or Numba compiles a second specialization.
+step_bodies(State.empty(3), TIME_STEP, 1)
+
+state, bodies = create_triangle_configuration()
+initial_kinetic, initial_potential = energy_terms(state)
+initial_energy = initial_kinetic + initial_potential
+energy_scale = abs(initial_kinetic) + abs(initial_potential)
+last_good_state = state.snapshot()
 paused = False
+diverged = False  # set when the integrator produced non-finite values
 simulation_speed = 1.0
 
+# Pre-render static text and set up cached labels for text that changes rarely
+title_text = title_font.render("Three-Body Problem - Equilateral Triangle Configuration", True, WHITE)
+info_text = font.render("Use mouse wheel to adjust simulation speed | Drag sliders to change mass", True, GRAY)
+status_surfs = {
+    True: font.render("Status: PAUSED", True, RED),
+    False: font.render("Status: RUNNING", True, GREEN)
+}
+diverged_surf = font.render("Status: DIVERGED - press Reset", True, RED)
+speed_label = Label(WHITE)
+drift_label = Label(WHITE)
+DRIFT_UPDATE_MS = 1000  # the energy check is diagnostic, so refresh it once per second
+ratio_label = Label(WHITE)
+dist_label = Label(WHITE)
+
+def build_ui_background():
+    # Everything that never changes, composed once and blitted every frame
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surface.fill(BLACK)
+    
+    # Center reference point
+    pygame.draw.circle(surface, GRAY, (WIDTH//2, SIMULATION_HEIGHT//2), 3)
+    
+    # Boundary line between simulation and controls
+    pygame.draw.line(surface, WHITE, (0, SIMULATION_HEIGHT), (WIDTH, SIMULATION_HEIGHT), 2)
+    
+    # UI panel with slider tracks, buttons and help text
+    pygame.draw.rect(surface, DARK_GRAY, (0, SIMULATION_HEIGHT, WIDTH, CONTROL_HEIGHT))
+    for slider in sliders:
+        slider.draw_track(surface)
+    reset_button.draw(surface)
+    pause_button.draw(surface)
+    clear_trails_button.draw(surface)
+    surface.blit(info_text, (WIDTH//2 - info_text.get_width()//2, SIMULATION_HEIGHT + 150))
+    return surface
+
+ui_bg = build_ui_background()
+simulation_rect = pygame.Rect(0, 0, WIDTH, SIMULATION_HEIGHT)
+# Status, speed, ratio and distance lines, which change every frame
+status_rect = pygame.Rect(500, SIMULATION_HEIGHT + 30, WIDTH - 500, 110)
+
 def reset_simulation():
-    global bodies
+    global state, bodies, initial_energy, energy_scale, last_good_state, next_drift_update
+    global paused, diverged
     masses = [slider.value for slider in sliders]
-    bodies = create_triangle_configuration(masses[0], masses[1], masses[2])
+    state, bodies = create_triangle_configuration(masses[0], masses[1], masses[2])
+    initial_kinetic, initial_potential = energy_terms(state)
+    initial_energy = initial_kinetic + initial_potential
+    energy_scale = abs(initial_kinetic) + abs(initial_potential)
+    next_drift_update = 0
+    last_good_state = state.snapshot()
+    
+    # A diverged run was paused automatically, so resume with the new one
+    if diverged:
+        paused = False
+        diverged = False
 
 def clear_trails():
-    for body in bodies:
-        body.trail = []
+    state.clear_trail()
+
+# Only queue the events the UI reacts to, plus the window events that mean
+# the whole display has to be repainted
+SLIDER_EVENTS = (MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION)
+REPAINT_EVENTS = (VIDEOEXPOSE, WINDOWEXPOSED, WINDOWRESTORED, WINDOWFOCUSGAINED)
+pygame.event.set_blocked(None)
+pygame.event.set_allowed([QUIT, MOUSEWHEEL, *SLIDER_EVENTS, *REPAINT_EVENTS])
 
 # Main game loop
 running = True
+full_redraw = True
+prev_masses = None
+ratio_text = None
+next_drift_update = 0
 while running:
     # Event handling
     for event in pygame.event.get():
         if event.type == QUIT:
             running = False
             
-        # Handle sliders
-        for slider in sliders:
-            slider.handle_event(event)
-            
-        # Handle buttons
-        if reset_button.is_clicked(event):
-            reset_simulation()
-            
-        if pause_button.is_clicked(event):
-            paused = not paused
-            
-        if clear_trails_button.is_clicked(event):
-            clear_trails()
-            
+        elif event.type in SLIDER_EVENTS:
+            # Handle sliders
+            for slider in sliders:
+                slider.handle_event(event)
+                
+            # Handle buttons
+            if event.type == MOUSEBUTTONDOWN:
+                if reset_button.is_clicked(event):
+                    reset_simulation()
+                    
+                if pause_button.is_clicked(event):
+                    paused = not paused
+                    
+                if clear_trails_button.is_clicked(event):
+                    clear_trails()
+                    
         # Speed control with mouse wheel
-        if event.type == MOUSEWHEEL:
+        elif event.type == MOUSEWHEEL:
             simulation_speed *= 1.2 if event.y > 0 else 0.8
             simulation_speed = max(0.1, min(10.0, simulation_speed))
+            
+        # The window was uncovered or restored, so present every pixel again
+        elif event.type in REPAINT_EVENTS:
+            full_redraw = True
     
     # Update physics if not paused
     if not paused:
-        for _ in range(int(simulation_speed)):
-            for body in bodies:
-                body.update_position(bodies, TIME_STEP)
-    
-    # Draw everything
-    screen.fill(BLACK)
-    
-    # Draw center reference point
-    pygame.draw.circle(screen, GRAY, (WIDTH//2, SIMULATION_HEIGHT//2), 3)
+        trail_head, trail_len = state.trail_head, state.trail_len
+        step_bodies(state, TIME_STEP, int(simulation_speed))
+        
+        # If the integrator blew up, roll back to the last finite state and
+        # pause: stepping again would deterministically blow up the same way
+        if state.is_finite():
+            last_good_state.copy_from(state)
+        else:
+            state.copy_from(last_good_state)
+            state.trail_head, state.trail_len = trail_head, trail_len
+            project_bodies(state)
+            paused = True
+            diverged = True
     
-    # Draw boundary line between simulation and controls
-    pygame.draw.line(screen, WHITE, (0, SIMULATION_HEIGHT), (WIDTH, SIMULATION_HEIGHT), 2)
+    # Draw static background and UI panel
+    screen.blit(ui_bg, (0, 0))
     
-    # Draw bodies
+    # Draw bodies, clipped so they stay out of the UI panel
+    screen.set_clip(simulation_rect)
     for body in bodies:
         body.draw(screen)
-    
-    # Draw UI panel
-    pygame.draw.rect(screen, DARK_GRAY, (0, SIMULATION_HEIGHT, WIDTH, CONTROL_HEIGHT))
+    screen.set_clip(None)
     
     # Draw title
-    title_text = title_font.render("Three-Body Problem - Equilateral Triangle Configuration", True, WHITE)
     screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 20))
     
     # Draw sliders
     for slider in sliders:
         slider.draw(screen)
     
-    # Draw buttons
-    reset_button.draw(screen)
-    pause_button.draw(screen)
-    clear_trails_button.draw(screen)
-    
     # Draw status and info
-    status_text = "PAUSED" if paused else "RUNNING"
-    status_color = RED if paused else GREEN
-    status_surf = font.render(f"Status: {status_text}", True, status_color)
-    screen.blit(status_surf, (500, SIMULATION_HEIGHT + 30))
+    screen.blit(diverged_surf if diverged else status_surfs[paused], (500, SIMULATION_HEIGHT + 30))
     
-    speed_text = font.render(f"Simulation Speed: {simulation_speed:.1f}x", True, WHITE)
+    speed_text = speed_label.render(f"Simulation Speed: {simulation_speed:.1f}x")
     screen.blit(speed_text, (500, SIMULATION_HEIGHT + 60))
     
-    # Draw mass ratio info
-    mass1 = sliders[0].value
-    mass2 = sliders[1].value
-    mass3 = sliders[2].value
-    total_mass = mass1 + mass2 + mass3
+    now = pygame.time.get_ticks()
+    if now >= next_drift_update:
+        next_drift_update = now + DRIFT_UPDATE_MS
+        drift = energy_drift(state, initial_energy, energy_scale)
+        drift_label.render(f"Energy Drift: {drift:.2e}")
+    screen.blit(drift_label.surf, (700, SIMULATION_HEIGHT + 60))
     
-    if total_mass > 0:
-        ratio_text = font.render(f"Mass Ratio: {mass1/total_mass:.2f} : {mass2/total_mass:.2f} : {mass3/total_mass:.2f}", True, WHITE)
+    # Draw mass ratio info, only re-formatted when a slider moved
+    slider_masses = tuple(slider.value for slider in sliders)
+    if slider_masses != prev_masses:
+        prev_masses = slider_masses
+        mass1, mass2, mass3 = slider_masses
+        total_mass = mass1 + mass2 + mass3
+        
+        ratio_text = None
+        if total_mass > 0:
+            ratio_text = ratio_label.render(f"Mass Ratio: {mass1/total_mass:.2f} : {mass2/total_mass:.2f} : {mass3/total_mass:.2f}")
+    
+    if ratio_text is not None:
         screen.blit(ratio_text, (500, SIMULATION_HEIGHT + 90))
     
     # Draw distance info between bodies
     if len(bodies) == 3:
-        dist1 = np.linalg.norm(bodies[0].position - bodies[1].position)
-        dist2 = np.linalg.norm(bodies[1].position - bodies[2].position)
-        dist3 = np.linalg.norm(bodies[2].position - bodies[0].position)
+        p = state.positions
+        dist1 = hypot(p[0, 0] - p[1, 0], p[0, 1] - p[1, 1])
+        dist2 = hypot(p[1, 0] - p[2, 0], p[1, 1] - p[2, 1])
+        dist3 = hypot(p[2, 0] - p[0, 0], p[2, 1] - p[0, 1])
         
-        dist_text = font.render(f"Distances: {dist1/1e11:.2f} / {dist2/1e11:.2f} / {dist3/1e11:.2f} x10¹¹ m", True, WHITE)
+        dist_text = dist_label.render(f"Distances: {dist1/1e11:.2f} / {dist2/1e11:.2f} / {dist3/1e11:.2f} x10¹¹ m")
         screen.blit(dist_text, (500, SIMULATION_HEIGHT + 120))
     
-    info_text = font.render("Use mouse wheel to adjust simulation speed | Drag sliders to change mass", True, GRAY)
-    screen.blit(info_text, (WIDTH//2 - info_text.get_width()//2, SIMULATION_HEIGHT + 150))
-    
-    # Update display
-    pygame.display.flip()
+    # Update display, only copying the regions that can have changed
+    if full_redraw:
+        pygame.display.flip()
+        full_redraw = False
+    else:
+        dirty = [simulation_rect, status_rect]
+        for slider in sliders:
+            if slider.changed:
+                dirty.append(slider.dirty_rect)
+                slider.changed = False
+        pygame.display.update(dirty)
     clock.tick(FPS)
 
 pygame.quit()